@@ -1,17 +1,30 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import pygame
-import time
 import os
 import logging
+import logging.handlers
 import random
+import json
+import atexit
+import threading
+import functools
 
 # Set up logging configuration for debugging and troubleshooting.
+# Log calls use %-style arguments so messages below the level are never formatted.
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"  # Include time, log level, and message.
+
+# Save logs to a file, buffered in memory so routine messages don't hit the SD card
+# one write at a time. Warnings and errors (and exit) flush the buffer immediately.
+# The MemoryHandler passes records on unformatted, so the file handler needs its own formatter.
+log_file_handler = logging.FileHandler("mp3_player.log", delay=True)
+log_file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
 logging.basicConfig(
-    level=logging.DEBUG,  # Log all messages of level DEBUG and higher.
-    format="%(asctime)s - %(levelname)s - %(message)s",  # Include time, log level, and message.
+    level=logging.INFO,  # Log all messages of level INFO and higher (use DEBUG when troubleshooting).
+    format=LOG_FORMAT,
     handlers=[
-        logging.FileHandler("mp3_player.log"),  # Save logs to a file.
+        logging.handlers.MemoryHandler(capacity=1024, flushLevel=logging.WARNING, target=log_file_handler),
         logging.StreamHandler()  # Also output logs to the console.
     ]
 )
@@ -24,6 +37,143 @@ except ImportError:
     use_mutagen = False
     logging.warning("Mutagen library not found. Fallback for track length will be used.")
 
+# Track lengths are cached here between runs, keyed by path and validated by mtime and size.
+DURATION_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "rpi_mp3_player.json")
+
+# Every casing of the ".mp3" extension, so file names can be matched without lowercasing them.
+_MP3_EXTS = (".mp3", ".MP3", ".Mp3", ".mP3")
+
+
+@functools.lru_cache(maxsize=8192)
+def _fmt_time(sec_int):
+    """
+    Format a whole number of seconds as MM:SS. Cached, since the progress display
+    asks for the same few values over and over.
+
+    Parameters:
+        sec_int (int): Time in whole seconds.
+
+    Returns:
+        str: Formatted time "MM:SS".
+    """
+    return f"{sec_int // 60:02d}:{sec_int % 60:02d}"
+
+
+# MPEG audio frame header tables, used by _estimate_mp3_length when mutagen is not installed.
+# Bitrates (kbps) by (MPEG-1?, layer) for bitrate indexes 1-14.
+_MPEG_BITRATES = {
+    (True, 1): (32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Sample rates (Hz) by version bits: 0 = MPEG-2.5, 2 = MPEG-2, 3 = MPEG-1.
+_MPEG_SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+
+
+def _parse_mpeg_header(data, i):
+    """
+    Parse the MPEG audio frame header at data[i:i + 4].
+
+    Parameters:
+        data (bytes): Audio data.
+        i (int): Offset of the candidate header.
+
+    Returns:
+        tuple: (version, layer, bitrate, sample_rate, frame_length, mono), or None if
+        there is no valid header at that offset.
+    """
+    if i + 4 > len(data) or data[i] != 0xFF:
+        return None
+    b1, b2, b3 = data[i + 1], data[i + 2], data[i + 3]
+    version = (b1 >> 3) & 0x03
+    layer = 4 - ((b1 >> 1) & 0x03)  # 1, 2 or 3 (4 is reserved).
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0x03
+    if ((b1 & 0xE0) != 0xE0 or version == 1 or layer == 4
+            or not 0 < bitrate_index < 15 or rate_index == 3):
+        return None
+    mpeg1 = version == 3
+    bitrate = _MPEG_BITRATES[(mpeg1, layer)][bitrate_index - 1] * 1000
+    sample_rate = _MPEG_SAMPLE_RATES[version][rate_index]
+    padding = (b2 >> 1) & 0x01
+    if layer == 1:
+        frame_length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 2 or mpeg1:
+        frame_length = 144 * bitrate // sample_rate + padding
+    else:
+        frame_length = 72 * bitrate // sample_rate + padding
+    return version, layer, bitrate, sample_rate, frame_length, (b3 >> 6) == 3
+
+
+def _estimate_mp3_length(path):
+    """
+    Estimate the length of an MP3 file from its first frame header, without decoding it.
+    Uses the frame count from a Xing/Info header (VBR files) if there is one, and
+    otherwise assumes a constant bitrate.
+
+    Parameters:
+        path (str): Path to the MP3 file.
+
+    Returns:
+        float: Track length in seconds (0 if no valid frame header was found).
+    """
+    with open(path, "rb") as f:
+        # Skip an ID3v2 tag, whose size is stored as a 28-bit "syncsafe" integer.
+        audio_start = 0
+        head = f.read(10)
+        if len(head) == 10 and head[:3] == b"ID3":
+            audio_start = 10 + ((head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9])
+            if head[5] & 0x10:  # Footer present.
+                audio_start += 10
+        f.seek(audio_start)
+        # Search the first 16 KB for a header; the extra bytes let a header near the end
+        # of that window be confirmed by the frame that follows it.
+        data = f.read(16384 + 4096)
+    file_size = os.path.getsize(path)
+    search_end = min(len(data), 16384)
+
+    # Find the first valid frame header (11 set sync bits followed by valid fields).
+    # Stray 0xFF bytes can look like one, so it only counts if another frame header
+    # of the same stream starts right where this frame ends.
+    i = data.find(b"\xff", 0, search_end)
+    while i != -1:
+        header = _parse_mpeg_header(data, i)
+        if header:
+            following = _parse_mpeg_header(data, i + header[4])
+            if following and following[:2] == header[:2] and following[3] == header[3]:
+                break
+        i = data.find(b"\xff", i + 1, search_end)
+    else:
+        return 0
+
+    version, layer, bitrate, sample_rate, frame_length, mono = header
+    mpeg1 = version == 3
+    if layer == 1:
+        samples_per_frame = 384
+    elif layer == 2 or mpeg1:
+        samples_per_frame = 1152
+    else:
+        samples_per_frame = 576
+
+    # A Xing/Info header sits in the first frame, right after the side information.
+    if mpeg1:
+        side_info = 17 if mono else 32
+    else:
+        side_info = 9 if mono else 17
+    tag_pos = i + 4 + side_info
+    if data[tag_pos:tag_pos + 4] in (b"Xing", b"Info"):
+        flags = int.from_bytes(data[tag_pos + 4:tag_pos + 8], "big")
+        if flags & 0x01:  # Frame count present.
+            frames = int.from_bytes(data[tag_pos + 8:tag_pos + 12], "big")
+            if frames:
+                return frames * samples_per_frame / sample_rate
+
+    # Constant bitrate: the audio data size divided by the byte rate.
+    return (file_size - audio_start - i) * 8 / bitrate
+
 
 class MP3Player:
     """
@@ -38,6 +188,17 @@ class MP3Player:
       - Playback controls: Play, Pause/Resume, Stop, Rewind (5s), Fast Forward (5s), and Next.
     """
 
+    # Mixer settings. A larger buffer avoids ALSA underruns ("out of buffers")
+    # on the Pi at the cost of latency: 4096 frames at 44.1 kHz is ~93 ms,
+    # which only delays the response to play/pause/seek, not the music itself.
+    MIXER_FREQUENCY = 44100
+    MIXER_SIZE = -16                     # Signed 16-bit samples.
+    MIXER_CHANNELS = 2
+    MIXER_BUFFER = 4096
+
+    # pygame event posted by the mixer when a track finishes playing.
+    MUSIC_END = pygame.USEREVENT + 1
+
     def __init__(self, root):
         """
         Initialize the MP3Player instance.
@@ -55,19 +216,216 @@ class MP3Player:
         self.playing = False             # True if a track is playing.
         self.paused = False              # True if playback is paused.
         self.track_length = 0            # Duration (in seconds) of the current track.
-        self.offset = 0                  # Elapsed time (in seconds) before a pause/seek.
-        self.play_start_time = None      # Timestamp when current playback started/resumed.
+        self.offset = 0                  # Track position (in seconds) where playback last started.
+        self._basename = ""              # File name of the current track, shown in the status bar.
+
+        # Last values drawn by update_progress, used to skip redundant widget updates.
+        self._last_sec = -1              # Whole second last shown in the status label.
+        self._last_prog = -1             # Whole percentage last shown in the progress bar.
+        self._last_status_text = "Status: Stopped"  # Text currently in status_var.
+        self._last_pause_text = "Pause"  # Text currently in pause_var.
 
         # Playlist variables (used when a folder is loaded).
         self.playlist = []               # List of MP3 file paths.
         self.current_index = -1          # Index of the current song in the playlist.
-
-        # Initialize the pygame mixer for audio playback.
-        pygame.mixer.init()
+        self._unplayed = []              # Playlist indices not yet played in this shuffle round.
+        self._next_index = None          # Index picked ahead of time as the next song, if any.
+        self._next_prefetch_thread = None  # Background thread warming up the next song.
+
+        # Persistent track length cache: {path: [mtime, size, length]}.
+        self._dur_cache = self._load_duration_cache()
+        self._dur_cache_dirty = False    # True if the cache has entries not yet written to disk.
+        atexit.register(self._save_duration_cache)
+
+        # Track lengths for the current playlist, filled in by a background scan (_scan_durations).
+        self._duration_map = {}
+        self._dur_lock = threading.Lock()  # Guards _dur_cache and _duration_map.
+        self._scan_generation = 0        # Bumped on each folder load to cancel stale scans.
+
+        # The pygame mixer is initialized lazily on first use (see _ensure_mixer),
+        # since an idle mixer still keeps the audio device busy.
+        self._mixer_ready = False        # True once pygame.mixer.init() has run.
+        self.volume = 1.0                # Last requested volume (0.0 to 1.0).
+        self._vol_job = None             # Pending root.after_idle id of _apply_volume, if scheduled.
+        self._pump_job = None            # Pending root.after id of _pump_pygame, if scheduled.
+        self._progress_job = None        # Pending root.after id of update_progress, if scheduled.
+        self._visible = True             # False while the window is minimized (unmapped).
+
+        # Bind the pygame.mixer.music functions used during playback once, instead of
+        # looking them up through two module attributes on every call.
+        m = pygame.mixer.music
+        self._m_play, self._m_pause, self._m_unpause, self._m_stop = m.play, m.pause, m.unpause, m.stop
+        self._m_load, self._m_set_volume = m.load, m.set_volume
+        self._m_get_pos, self._m_set_pos = m.get_pos, m.set_pos
 
         # Create the GUI widgets.
         self.create_widgets()
 
+        # Release the audio device when the window is closed.
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Track whether the window can be seen, so progress redraws can pause while it is
+        # minimized or fully covered by other windows.
+        self.root.bind("<Unmap>", self._on_unmap)
+        self.root.bind("<Map>", self._on_map)
+        self.root.bind("<Visibility>", self._on_visibility)
+
+    def _ensure_mixer(self):
+        """
+        Initialize the pygame mixer on first use and apply the current volume.
+        The player only counts as ready once every step has succeeded, so a failed
+        attempt is retried on the next call.
+        """
+        if not self._mixer_ready:
+            pygame.mixer.init(frequency=self.MIXER_FREQUENCY, size=self.MIXER_SIZE,
+                              channels=self.MIXER_CHANNELS, buffer=self.MIXER_BUFFER)
+            try:
+                # The event queue needs pygame's video subsystem, but no window is ever opened,
+                # so the dummy driver is used unless one was chosen explicitly.
+                os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+                pygame.display.init()
+                pygame.mixer.music.set_endevent(self.MUSIC_END)
+            except pygame.error:
+                pygame.mixer.quit()
+                raise
+            self._m_set_volume(self.volume)
+            self._mixer_ready = True
+            logging.info("Initialized pygame mixer.")
+
+    def _load_duration_cache(self):
+        """
+        Load the track length cache from DURATION_CACHE_FILE.
+
+        Returns:
+            dict: The cached entries, or an empty dict if the file is missing or unreadable.
+        """
+        try:
+            with open(DURATION_CACHE_FILE, "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(cache, dict):
+            logging.warning("Ignoring malformed duration cache: %s", DURATION_CACHE_FILE)
+            return {}
+        return cache
+
+    def _save_duration_cache(self):
+        """
+        Write the track length cache to DURATION_CACHE_FILE if it has changed.
+        """
+        with self._dur_lock:
+            if not self._dur_cache_dirty:
+                return
+            cache = dict(self._dur_cache)
+            self._dur_cache_dirty = False
+        try:
+            os.makedirs(os.path.dirname(DURATION_CACHE_FILE), exist_ok=True)
+            with open(DURATION_CACHE_FILE, "w") as f:
+                json.dump(cache, f)
+            logging.info("Saved %s cached track lengths.", len(cache))
+        except OSError as e:
+            logging.warning("Could not save duration cache: %s", e)
+
+    def _get_length(self, path):
+        """
+        Return the length of an MP3 file, using the persistent cache when the file is unchanged.
+
+        Parameters:
+            path (str): Path to the MP3 file.
+
+        Returns:
+            float: Track length in seconds (0 if it could not be determined).
+        """
+        st = os.stat(path)
+        with self._dur_lock:
+            entry = self._dur_cache.get(path)
+        if entry and entry[0] == st.st_mtime and entry[1] == st.st_size:
+            return entry[2]
+
+        # Determine track length using mutagen if available.
+        if use_mutagen:
+            length = MP3(path).info.length
+        else:
+            length = _estimate_mp3_length(path)
+            if not length:
+                logging.warning("Could not determine track length using fallback.")
+                return 0
+        with self._dur_lock:
+            self._dur_cache[path] = [st.st_mtime, st.st_size, length]
+            self._dur_cache_dirty = True
+        return length
+
+    def _scan_durations(self, paths, generation):
+        """
+        Determine the length of every track in a playlist. Runs on a background thread
+        so that loading a folder does not wait for mutagen to parse each file.
+        No tkinter calls are made from here; results are only read by the main thread.
+
+        Parameters:
+            paths (list): MP3 file paths to scan.
+            generation (int): Value of _scan_generation when the scan was started.
+        """
+        for path in paths:
+            if generation != self._scan_generation:
+                logging.debug("Abandoning duration scan for a replaced playlist.")
+                return
+            try:
+                length = self._get_length(path)
+            except Exception as e:
+                logging.warning("Could not determine track length of %s: %s", path, e)
+                continue
+            with self._dur_lock:
+                self._duration_map[path] = length
+        logging.info("Finished scanning %s track lengths.", len(paths))
+
+    def _prefetch_next(self):
+        """
+        Pick the next song of the playlist now and warm it up on a background thread,
+        so the switch at the end of the current song does not wait on the SD card.
+        """
+        if self._next_index is None:
+            self._next_index = self._pick_next_index()
+        if self._next_index == self.current_index:
+            return  # Single-song playlist; the file is already loaded.
+        self._next_prefetch_thread = threading.Thread(target=self._prefetch_file,
+                                                      args=(self.playlist[self._next_index],),
+                                                      daemon=True)
+        self._next_prefetch_thread.start()
+
+    def _prefetch_file(self, path):
+        """
+        Read an MP3 file once so it is in the OS page cache, and determine its length.
+        Runs on a background thread; no tkinter calls are made from here.
+
+        Parameters:
+            path (str): Path to the MP3 file.
+        """
+        try:
+            with open(path, "rb") as f:
+                while f.read(1 << 20):  # Read in 1 MB chunks to keep memory use flat.
+                    pass
+            length = self._get_length(path)
+            with self._dur_lock:
+                self._duration_map[path] = length
+            logging.debug("Prefetched next song: %s", path)
+        except Exception as e:
+            logging.warning("Could not prefetch %s: %s", path, e)
+
+    def on_close(self):
+        """
+        Shut down the pygame mixer (if it was started) and close the window.
+        """
+        self._stop_pump()
+        if self._progress_job is not None:
+            self.root.after_cancel(self._progress_job)
+            self._progress_job = None
+        if self._mixer_ready:
+            self._m_stop()
+            pygame.mixer.quit()
+            pygame.display.quit()
+            self._mixer_ready = False
+        self.root.destroy()
+
     def create_widgets(self):
         """
         Create and arrange the GUI elements.
@@ -89,7 +447,8 @@ class MP3Player:
         self.play_button.grid(row=0, column=2, padx=5)
 
         # Pause/Resume toggle button.
-        self.pause_button = tk.Button(button_frame, text="Pause", width=10, command=self.toggle_pause, state=tk.DISABLED)
+        self.pause_var = tk.StringVar(value=self._last_pause_text)
+        self.pause_button = tk.Button(button_frame, textvariable=self.pause_var, width=10, command=self.toggle_pause, state=tk.DISABLED)
         self.pause_button.grid(row=0, column=3, padx=5)
 
         # Stop button.
@@ -107,7 +466,8 @@ class MP3Player:
         self.volume_scale.bind("<Button-1>", self.jump_volume)
 
         # Status bar: displays file name and play time.
-        self.status_label = tk.Label(self.root, text="Status: Stopped", font=("Helvetica", 12),
+        self.status_var = tk.StringVar(value=self._last_status_text)
+        self.status_label = tk.Label(self.root, textvariable=self.status_var, font=("Helvetica", 12),
                                      relief="sunken", bd=2)
         self.status_label.pack(fill='x', padx=20, pady=5)
 
@@ -132,6 +492,28 @@ class MP3Player:
                                      command=self.play_next_song, state=tk.DISABLED)
         self.next_button.grid(row=0, column=2, padx=5)
 
+    def _set_status(self, text):
+        """
+        Show text in the status bar, touching the Tk variable only if the text changed.
+
+        Parameters:
+            text (str): The new status text.
+        """
+        if text != self._last_status_text:
+            self._last_status_text = text
+            self.status_var.set(text)
+
+    def _set_pause_text(self, text):
+        """
+        Set the Pause/Resume button label, touching the Tk variable only if it changed.
+
+        Parameters:
+            text (str): The new button label.
+        """
+        if text != self._last_pause_text:
+            self._last_pause_text = text
+            self.pause_var.set(text)
+
     def jump_volume(self, event):
         """
         When the user clicks on the volume slider trough, jump the volume to that spot.
@@ -154,38 +536,31 @@ class MP3Player:
             filetypes=[("MP3 Files", "*.mp3")]
         )
         if file_path:
+            # Reject unsupported files before touching the current playback or playlist.
+            if not file_path.endswith(_MP3_EXTS):
+                messagebox.showwarning("Unsupported File", "Only MP3 files are supported.")
+                logging.warning("Unsupported file type selected: %s", file_path)
+                return
+
+            # Stop any current playback; loading replaces the track in the mixer.
+            if self.playing:
+                self.stop_music()
+
             # Clear any existing folder playlist.
             self.playlist = []
             self.current_index = -1
+            self._unplayed = []
+            self._next_index = None
+            self._scan_generation += 1  # Stop any background scan of the old playlist.
 
-            self.current_file = file_path
-            if file_path.lower().endswith(".mp3"):
-                try:
-                    # Load the selected MP3 file.
-                    pygame.mixer.music.load(self.current_file)
-                    self.status_label.config(text=f"Status: Loaded {os.path.basename(self.current_file)}")
-                    self.play_button.config(state=tk.NORMAL)
-                    self.next_button.config(state=tk.DISABLED)  # No next song in single file mode.
-                    logging.info(f"Loaded file: {self.current_file}")
-
-                    # Determine track length using mutagen if available.
-                    if use_mutagen:
-                        audio = MP3(self.current_file)
-                        self.track_length = audio.info.length
-                    else:
-                        try:
-                            sound = pygame.mixer.Sound(self.current_file)
-                            self.track_length = sound.get_length()
-                        except Exception as e:
-                            self.track_length = 0
-                            logging.warning("Could not determine track length using fallback.")
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to load the file:\n{e}")
-                    logging.error(f"Error loading file: {e}")
-                    self.current_file = None
-            else:
-                messagebox.showwarning("Unsupported File", "Only MP3 files are supported.")
-                logging.warning(f"Unsupported file type selected: {file_path}")
+            try:
+                # Load the selected MP3 file.
+                self._activate_track(file_path, autoplay=False)
+                logging.info("Loaded file: %s", self.current_file)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to load the file:\n{e}")
+                logging.error("Error loading file: %s", e)
+                self.current_file = None
 
     def load_folder(self):
         """
@@ -199,50 +574,69 @@ class MP3Player:
             if self.playing:
                 self.stop_music()
 
-            # Build a new playlist.
-            mp3_files = []
-            for file in os.listdir(folder_path):
-                if file.lower().endswith(".mp3"):
-                    full_path = os.path.join(folder_path, file)
-                    mp3_files.append(full_path)
-                    logging.debug(f"Found file: {full_path}")
+            # Build a new playlist (scandir gives the file type without an extra stat per entry).
+            with os.scandir(folder_path) as it:
+                mp3_files = [entry.path for entry in it
+                             if entry.is_file(follow_symlinks=False) and entry.name.endswith(_MP3_EXTS)]
+            logging.debug("Found %s MP3 files in %s", len(mp3_files), folder_path)
 
             if not mp3_files:
                 messagebox.showwarning("No MP3 Files", "No MP3 files found in the selected folder.")
                 return
 
-            # Shuffle the list and set as the new playlist.
+            # Set the new playlist; the play order is shuffled one pick at a time.
             self.playlist = mp3_files
-            random.shuffle(self.playlist)
-            self.current_index = 0
-            self.current_file = self.playlist[self.current_index]
-            logging.debug(f"New playlist: {self.playlist}")
+            self._unplayed = list(range(len(self.playlist)))
+            self._next_index = None
+            self.current_index = self._pick_next_index()
+
+            # Scan the remaining track lengths in the background.
+            self._scan_generation += 1
+            with self._dur_lock:
+                self._duration_map = {}
+            threading.Thread(target=self._scan_durations,
+                             args=(list(self.playlist), self._scan_generation),
+                             daemon=True).start()
+            logging.debug("New playlist: %s", self.playlist)
 
             try:
-                pygame.mixer.music.load(self.current_file)
-                self.status_label.config(text=f"Status: Loaded {os.path.basename(self.current_file)}")
-                self.play_button.config(state=tk.NORMAL)
-                self.next_button.config(state=tk.NORMAL)  # Enable Next in folder mode.
-                logging.info(f"Loaded folder: {folder_path} with {len(self.playlist)} files. Starting with: {self.current_file}")
-
-                # Determine track length.
-                if use_mutagen:
-                    audio = MP3(self.current_file)
-                    self.track_length = audio.info.length
-                else:
-                    try:
-                        sound = pygame.mixer.Sound(self.current_file)
-                        self.track_length = sound.get_length()
-                    except Exception as e:
-                        self.track_length = 0
-                        logging.warning("Could not determine track length using fallback.")
-                # Automatically start playback of the first song.
-                self.play_music()
+                # Load and automatically start playback of the first song.
+                logging.info("Loaded folder: %s with %s files. Starting with: %s",
+                             folder_path, len(self.playlist), self.playlist[self.current_index])
+                self._activate_track(self.playlist[self.current_index], autoplay=True)
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load the file:\n{e}")
-                logging.error(f"Error loading file: {e}")
+                logging.error("Error loading file: %s", e)
                 self.current_file = None
 
+    def _activate_track(self, path, autoplay):
+        """
+        Make the given MP3 file the current track: load it into the mixer, determine its
+        length, and update the status bar and buttons. Errors are left to the caller.
+
+        Parameters:
+            path (str): Path to the MP3 file.
+            autoplay (bool): Start playback once the track is loaded.
+        """
+        self.current_file = path
+        self._basename = os.path.basename(path)
+        self._ensure_mixer()
+        self._m_load(path)
+
+        # Determine track length (from the background scan or the persistent cache if possible).
+        with self._dur_lock:
+            length = self._duration_map.get(path)
+        if length is None:
+            length = self._get_length(path)
+        self.track_length = length
+
+        self._set_status(f"Status: Loaded {self._basename}")
+        self.play_button.config(state=tk.NORMAL)
+        # Next is only available in folder mode.
+        self.next_button.config(state=tk.NORMAL if self.playlist else tk.DISABLED)
+        if autoplay:
+            self.play_music()
+
     def play_music(self):
         """
         Start playback of the currently loaded MP3 file.
@@ -250,24 +644,30 @@ class MP3Player:
         """
         if self.current_file:
             try:
-                pygame.mixer.music.play()
+                self._ensure_mixer()
+                pygame.event.clear(self.MUSIC_END)  # Drop end events from earlier tracks or stop().
+                self._m_play()
                 self.offset = 0  # Reset any previous offset.
-                self.play_start_time = time.time()  # Record the start time.
+                self._last_sec = self._last_prog = -1  # Force a redraw on the first update.
                 self.playing = True
                 self.paused = False
                 # Update control buttons.
                 self.play_button.config(state=tk.DISABLED)
-                self.pause_button.config(state=tk.NORMAL, text="Pause")
+                self.pause_button.config(state=tk.NORMAL)
+                self._set_pause_text("Pause")
                 self.stop_button.config(state=tk.NORMAL)
                 self.rewind_button.config(state=tk.NORMAL)
                 self.fast_forward_button.config(state=tk.NORMAL)
                 if self.playlist:
                     self.next_button.config(state=tk.NORMAL)
-                logging.info(f"Started playing: {self.current_file}")
-                self.update_progress()  # Begin updating progress.
+                logging.info("Started playing: %s", self.current_file)
+                self._start_progress()  # Begin updating progress.
+                self._start_pump()
+                if self.playlist:
+                    self._prefetch_next()
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to play the file:\n{e}")
-                logging.error(f"Error playing file: {e}")
+                logging.error("Error playing file: %s", e)
         else:
             messagebox.showwarning("No File Selected", "Please load an MP3 file or folder first.")
 
@@ -278,52 +678,63 @@ class MP3Player:
         """
         if self.playing:
             if not self.paused:
-                pygame.mixer.music.pause()
-                if self.play_start_time is not None:
-                    self.offset += time.time() - self.play_start_time
-                self.play_start_time = None
+                self._m_pause()
                 self.paused = True
-                self.pause_button.config(text="Resume")
-                logging.info(f"Paused playback of: {self.current_file}")
+                self._stop_pump()  # No end event can arrive while paused.
+                self._last_sec = -1  # Status text changes to "Paused".
+                self._set_pause_text("Resume")
+                logging.info("Paused playback of: %s", self.current_file)
             else:
-                pygame.mixer.music.unpause()
-                self.play_start_time = time.time()
+                self._m_unpause()
                 self.paused = False
-                self.pause_button.config(text="Pause")
-                logging.info(f"Resumed playback of: {self.current_file}")
+                self._start_pump()
+                self._last_sec = -1  # Status text changes back to "Playing".
+                self._set_pause_text("Pause")
+                logging.info("Resumed playback of: %s", self.current_file)
 
     def stop_music(self):
         """
         Stop playback and reset the player state and control buttons.
         """
         if self.playing:
-            pygame.mixer.music.stop()
-            self.status_label.config(text="Status: Stopped")
+            self._m_stop()
+            self._set_status("Status: Stopped")
             self.playing = False
             self.paused = False
             self.offset = 0
-            self.play_start_time = None
             # Reset control buttons.
             self.play_button.config(state=tk.NORMAL)
-            self.pause_button.config(state=tk.DISABLED, text="Pause")
+            self.pause_button.config(state=tk.DISABLED)
+            self._set_pause_text("Pause")
             self.stop_button.config(state=tk.DISABLED)
             self.rewind_button.config(state=tk.DISABLED)
             self.fast_forward_button.config(state=tk.DISABLED)
             self.next_button.config(state=tk.DISABLED)
             self.progress_var.set(0)
-            logging.info(f"Stopped playback of: {self.current_file}")
+            self._last_sec = self._last_prog = -1
+            logging.info("Stopped playback of: %s", self.current_file)
 
     def set_volume(self, value):
         """
-        Set the playback volume.
+        Set the playback volume. Dragging the slider calls this for every step, so the
+        value is only stored here and applied to the mixer once per idle cycle.
 
         Parameters:
             value (str or int): Volume percentage (0 to 100).
         """
-        volume_percentage = int(value)
-        volume = volume_percentage / 100.0  # Convert to a float between 0.0 and 1.0.
-        pygame.mixer.music.set_volume(volume)
-        logging.info(f"Set volume to: {volume_percentage}%")
+        self.volume = int(value) / 100.0  # Convert to a float between 0.0 and 1.0.
+        if self._vol_job is None:
+            self._vol_job = self.root.after_idle(self._apply_volume)
+
+    def _apply_volume(self):
+        """
+        Apply the last requested volume to the mixer.
+        """
+        self._vol_job = None
+        # Before the mixer is started the volume is only stored; _ensure_mixer applies it.
+        if self._mixer_ready:
+            self._m_set_volume(self.volume)
+        logging.info("Set volume to: %s%%", round(self.volume * 100))
 
     def format_time(self, seconds):
         """
@@ -335,66 +746,161 @@ class MP3Player:
         Returns:
             str: Formatted time "MM:SS".
         """
-        minutes = int(seconds // 60)
-        seconds = int(seconds % 60)
-        return f"{minutes:02d}:{seconds:02d}"
+        return _fmt_time(int(seconds))
+
+    def get_current_time(self):
+        """
+        Return the playback position of the current track, based on the mixer's audio clock.
+
+        Returns:
+            float: Elapsed time in seconds (the full track length once playback has finished).
+        """
+        pos = self._m_get_pos()  # Milliseconds since play(); frozen while paused.
+        if pos < 0:
+            return self.track_length  # Nothing is playing any more.
+        return self.offset + pos / 1000.0
 
     def update_progress(self):
         """
         Update the progress bar and status label with current playback time.
-        If the track finishes (and playback is not paused), auto-play the next track (in folder mode).
+        Widgets are only reconfigured when the displayed second or percentage changes.
+        Track changes at the end of a song are handled by _pump_pygame.
+        While the window is hidden nothing is redrawn and the check runs less often.
         """
+        self._progress_job = None
+        if not self._visible:
+            if self.playing:
+                self._progress_job = self.root.after(1000, self.update_progress)
+            return
         if self.playing and self.track_length > 0:
-            if self.paused:
-                current_time = self.offset
-            else:
-                current_time = self.offset + (time.time() - self.play_start_time)
+            current_time = self.get_current_time()
             if current_time > self.track_length:
                 current_time = self.track_length
-            progress = (current_time / self.track_length) * 100
-            self.progress_var.set(min(progress, 100))
-            time_str = f"{self.format_time(current_time)} / {self.format_time(self.track_length)}"
-            base_status = "Paused" if self.paused else "Playing"
-            self.status_label.config(text=f"Status: {base_status} {os.path.basename(self.current_file)} [{time_str}]")
-            
-            # If playback has finished (and is not paused), auto-play the next track (if in folder mode).
-            if not pygame.mixer.music.get_busy() and not self.paused:
-                if self.playlist:
-                    self.play_next_song()
-                    return
-                else:
-                    self.stop_music()
-                    self.progress_var.set(100)
-                    return
-            self.root.after(500, self.update_progress)
+            progress = int((current_time / self.track_length) * 100)
+            if progress != self._last_prog:
+                self._last_prog = progress
+                self.progress_var.set(min(progress, 100))
+            current_sec = int(current_time)
+            if current_sec != self._last_sec:
+                self._last_sec = current_sec
+                time_str = f"{self.format_time(current_time)} / {self.format_time(self.track_length)}"
+                base_status = "Paused" if self.paused else "Playing"
+                self._set_status(f"Status: {base_status} {self._basename} [{time_str}]")
+            self._progress_job = self.root.after(500, self.update_progress)
+
+    def _on_unmap(self, event):
+        """
+        Note that the main window was minimized, pausing progress redraws.
+
+        Parameters:
+            event: The tkinter event object.
+        """
+        if event.widget is self.root:
+            self._visible = False
+
+    def _on_map(self, event):
+        """
+        Note that the main window is shown again, resuming progress redraws.
+
+        Parameters:
+            event: The tkinter event object.
+        """
+        if event.widget is self.root:
+            self._visible = True
+
+    def _on_visibility(self, event):
+        """
+        Note whether the main window is completely covered by other windows,
+        pausing progress redraws while it is.
+
+        Parameters:
+            event: The tkinter event object.
+        """
+        if event.widget is self.root:
+            self._visible = event.state != "VisibilityFullyObscured"
+
+    def _start_progress(self):
+        """
+        Start the update_progress chain for a newly started track. A chain left over from
+        the previous track is cancelled first: it does not end at a track change, since
+        the end of a track is detected by _pump_pygame rather than by update_progress.
+        """
+        if self._progress_job is not None:
+            self.root.after_cancel(self._progress_job)
+            self._progress_job = None
+        self.update_progress()
+
+    def _start_pump(self):
+        """
+        Start polling the pygame event queue, unless a poll is already scheduled.
+        """
+        if self._pump_job is None:
+            self._pump_job = self.root.after(100, self._pump_pygame)
+
+    def _stop_pump(self):
+        """
+        Cancel the scheduled poll of the pygame event queue, if any.
+        """
+        if self._pump_job is not None:
+            self.root.after_cancel(self._pump_job)
+            self._pump_job = None
+
+    def _pump_pygame(self):
+        """
+        Check for the mixer's end-of-track event while playing (not while paused).
+        When a track finishes, auto-play the next track (in folder mode) or stop.
+        While the window is hidden the queue is checked once a second instead of ten times.
+        """
+        self._pump_job = None
+        if not self.playing or self.paused:
+            return  # toggle_pause restarts the pump on resume.
+        if pygame.event.get(eventtype=self.MUSIC_END):
+            self._finish_track()  # Restarts the pump if another song starts.
+            return
+        self._pump_job = self.root.after(100 if self._visible else 1000, self._pump_pygame)
+
+    def _finish_track(self):
+        """
+        Handle the end of the current track: auto-play the next track (in folder mode) or stop.
+        """
+        if self.playlist:
+            self.play_next_song()
+        else:
+            self.stop_music()
+            self.progress_var.set(100)
 
     def seek(self, delta):
         """
         Seek forward or backward in the current track by delta seconds.
+        Seeking to (or past) the end finishes the track instead of reloading it.
 
         Parameters:
             delta (float): Seconds to seek (positive for forward, negative for rewind).
         """
         if self.playing and self.track_length > 0:
-            if self.paused:
-                current_time = self.offset
-            else:
-                current_time = self.offset + (time.time() - self.play_start_time)
+            current_time = self.get_current_time()
             new_time = current_time + delta
+            if new_time >= self.track_length - 0.25:
+                logging.info("Seeked past the end of %s", self.current_file)
+                self._finish_track()
+                return
             if new_time < 0:
                 new_time = 0
-            elif new_time > self.track_length:
-                new_time = self.track_length - 1  # Slightly before the end.
-            was_paused = self.paused
-            pygame.mixer.music.play(start=new_time)
-            self.offset = new_time
-            if not was_paused:
-                self.play_start_time = time.time()
-                logging.info(f"Seeked to {new_time:.2f} seconds in {self.current_file}")
+            try:
+                # Reposition the running stream; this keeps the pause state as it is.
+                self._m_set_pos(new_time)
+                # set_pos() does not reset get_pos(), so fold its current value into the offset.
+                self.offset = new_time - max(self._m_get_pos(), 0) / 1000.0
+            except pygame.error:
+                # Repositioning is not supported here: restart the stream at new_time instead.
+                self._m_play(start=new_time)
+                self.offset = new_time  # get_pos() restarts from 0 after play().
+                if self.paused:
+                    self._m_pause()
+            if not self.paused:
+                logging.info("Seeked to %.2f seconds in %s", new_time, self.current_file)
             else:
-                pygame.mixer.music.pause()
-                self.play_start_time = None
-                logging.info(f"Seeked (paused) to {new_time:.2f} seconds in {self.current_file}")
+                logging.info("Seeked (paused) to %.2f seconds in %s", new_time, self.current_file)
 
     def jump_to_position(self, event):
         """
@@ -407,11 +913,7 @@ class MP3Player:
             widget_width = event.widget.winfo_width()
             fraction = event.x / widget_width
             new_time = fraction * self.track_length
-            if self.paused:
-                current_time = self.offset
-            else:
-                current_time = self.offset + (time.time() - self.play_start_time)
-            delta = new_time - current_time
+            delta = new_time - self.get_current_time()
             self.seek(delta)
 
     def rewind_music(self):
@@ -426,42 +928,44 @@ class MP3Player:
         """
         self.seek(5)
 
+    def _pick_next_index(self):
+        """
+        Pick a random playlist index that has not been played in the current round
+        (an incremental Fisher-Yates shuffle). Once every song has been played, a new
+        round with all songs begins; the current song is not picked first in the new round.
+
+        Returns:
+            int: Index into self.playlist.
+        """
+        if not self._unplayed:
+            self._unplayed = list(range(len(self.playlist)))
+        unplayed = self._unplayed
+        j = random.randrange(len(unplayed))
+        if unplayed[j] == self.current_index and len(unplayed) > 1:
+            # Avoid an immediate repeat: draw again from the other songs. The current
+            # song stays in the round and is played later.
+            k = random.randrange(len(unplayed) - 1)
+            j = k + 1 if k >= j else k
+        unplayed[j], unplayed[-1] = unplayed[-1], unplayed[j]
+        return unplayed.pop()
+
     def play_next_song(self):
         """
-        Advance to the next song in the playlist and start playback.
-        Loops back to the beginning if at the end.
+        Advance to a random song not yet played in the playlist and start playback.
+        Starts a new shuffle round once every song has been played.
         """
         if self.playlist:
-            self.current_index = (self.current_index + 1) % len(self.playlist)
-            self.current_file = self.playlist[self.current_index]
+            if self._next_index is not None:
+                # Use the song picked (and prefetched) while the previous one was playing.
+                self.current_index = self._next_index
+                self._next_index = None
+            else:
+                self.current_index = self._pick_next_index()
             try:
-                pygame.mixer.music.load(self.current_file)
-                if use_mutagen:
-                    audio = MP3(self.current_file)
-                    self.track_length = audio.info.length
-                else:
-                    try:
-                        sound = pygame.mixer.Sound(self.current_file)
-                        self.track_length = sound.get_length()
-                    except Exception as e:
-                        self.track_length = 0
-                        logging.warning("Could not determine track length using fallback.")
-                pygame.mixer.music.play()
-                self.offset = 0
-                self.play_start_time = time.time()
-                self.status_label.config(text=f"Status: Playing {os.path.basename(self.current_file)}")
-                self.playing = True
-                self.paused = False
-                self.play_button.config(state=tk.DISABLED)
-                self.pause_button.config(state=tk.NORMAL, text="Pause")
-                self.stop_button.config(state=tk.NORMAL)
-                self.rewind_button.config(state=tk.NORMAL)
-                self.fast_forward_button.config(state=tk.NORMAL)
-                self.next_button.config(state=tk.NORMAL)
-                logging.info(f"Playing next song: {self.current_file}")
-                self.update_progress()
+                logging.info("Playing next song: %s", self.playlist[self.current_index])
+                self._activate_track(self.playlist[self.current_index], autoplay=True)
             except Exception as e:
-                logging.error(f"Error playing next song: {e}")
+                logging.error("Error playing next song: %s", e)
 
 
 def main():
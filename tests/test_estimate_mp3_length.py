@@ -0,0 +1,81 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mp3_player import _estimate_mp3_length  # noqa: E402
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, stereo, no padding: 417-byte frames.
+MPEG1_L3_HEADER = b"\xff\xfb\x90\x00"
+MPEG1_L3_FRAME_LENGTH = 417
+# MPEG-2 Layer III, 64 kbps, 22.05 kHz, mono, no padding: 208-byte frames.
+MPEG2_L3_MONO_HEADER = b"\xff\xf3\x80\xc0"
+MPEG2_L3_MONO_FRAME_LENGTH = 208
+
+
+def make_frames(header, frame_length, count):
+    """
+    Build count silent frames, each starting with the given header.
+    """
+    return (header + b"\x00" * (frame_length - len(header))) * count
+
+
+def make_xing_frame(header, frame_length, side_info, frames):
+    """
+    Build a first frame carrying a Xing header with a frame count.
+    """
+    body = b"\x00" * side_info + b"Xing" + (1).to_bytes(4, "big") + frames.to_bytes(4, "big")
+    return header + body + b"\x00" * (frame_length - len(header) - len(body))
+
+
+class EstimateMP3LengthTest(unittest.TestCase):
+    """
+    Tests for the header-based length estimate used when mutagen is not installed.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "track.mp3")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def estimate(self, data):
+        with open(self.path, "wb") as f:
+            f.write(data)
+        return _estimate_mp3_length(self.path)
+
+    def test_cbr_after_id3_tag(self):
+        # A 100-byte ID3v2 tag (90 bytes of tag data) followed by 128 kbps frames.
+        tag = b"ID3\x03\x00\x00" + bytes([0, 0, 0, 90]) + b"\x00" * 90
+        audio = make_frames(MPEG1_L3_HEADER, MPEG1_L3_FRAME_LENGTH, 400)
+        self.assertAlmostEqual(self.estimate(tag + audio), len(audio) * 8 / 128000)
+
+    def test_xing_frame_count_mpeg1_stereo(self):
+        data = (make_xing_frame(MPEG1_L3_HEADER, MPEG1_L3_FRAME_LENGTH, 32, 383)
+                + make_frames(MPEG1_L3_HEADER, MPEG1_L3_FRAME_LENGTH, 10))
+        self.assertAlmostEqual(self.estimate(data), 383 * 1152 / 44100)
+
+    def test_info_frame_count_mpeg2_mono(self):
+        data = (make_xing_frame(MPEG2_L3_MONO_HEADER, MPEG2_L3_MONO_FRAME_LENGTH, 9, 100)
+                .replace(b"Xing", b"Info")
+                + make_frames(MPEG2_L3_MONO_HEADER, MPEG2_L3_MONO_FRAME_LENGTH, 10))
+        self.assertAlmostEqual(self.estimate(data), 100 * 576 / 22050)
+
+    def test_unconfirmed_sync_is_rejected(self):
+        self.assertEqual(self.estimate(b"\xff" * 10 + b"abc"), 0)
+
+    def test_false_sync_before_first_frame_is_skipped(self):
+        # b"\xff\xfb\x90" looks like a header but is not followed by another frame.
+        junk = b"\xff\xfb\x90\x00junk"
+        audio = make_frames(MPEG1_L3_HEADER, MPEG1_L3_FRAME_LENGTH, 100)
+        self.assertAlmostEqual(self.estimate(junk + audio), len(audio) * 8 / 128000)
+
+    def test_no_frames(self):
+        self.assertEqual(self.estimate(b"not an mp3 file" * 100), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
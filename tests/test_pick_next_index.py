@@ -0,0 +1,58 @@
+import os
+import random
+import sys
+import types
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mp3_player import MP3Player  # noqa: E402
+
+
+def make_player(size):
+    """
+    Build a stand-in with just the playlist state _pick_next_index uses.
+    """
+    return types.SimpleNamespace(playlist=[f"t{i}.mp3" for i in range(size)],
+                                 current_index=-1, _unplayed=list(range(size)))
+
+
+def play_rounds(player, rounds):
+    """
+    Pick rounds * len(playlist) songs the way load_folder/play_next_song do.
+    """
+    picks = []
+    for _ in range(rounds * len(player.playlist)):
+        player.current_index = MP3Player._pick_next_index(player)
+        picks.append(player.current_index)
+    return picks
+
+
+class PickNextIndexTest(unittest.TestCase):
+    """
+    Tests for the incremental shuffle of folder playlists.
+    """
+
+    def setUp(self):
+        random.seed(1234)
+
+    def test_every_song_once_per_round(self):
+        for size in (2, 3, 5, 10):
+            player = make_player(size)
+            picks = play_rounds(player, 20)
+            for start in range(0, len(picks), size):
+                self.assertEqual(sorted(picks[start:start + size]), list(range(size)),
+                                 f"round at pick {start} with {size} songs")
+
+    def test_no_immediate_repeat(self):
+        for size in (2, 3, 5):
+            picks = play_rounds(make_player(size), 20)
+            for previous, current in zip(picks, picks[1:]):
+                self.assertNotEqual(previous, current)
+
+    def test_single_song_repeats(self):
+        self.assertEqual(play_rounds(make_player(1), 3), [0, 0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()